@@ -3,4 +3,12 @@ class InvalidJSONTransform(Exception):
 
 
 class SendMessedge(Exception):
-    """Возникает при ошибке отправки сообщения."""
\ No newline at end of file
+    """Возникает при ошибке отправки сообщения."""
+
+
+class ApiAuthError(Exception):
+    """Возникает при ошибке авторизации в API Практикума."""
+
+
+class CircuitOpenError(Exception):
+    """Возникает, когда запросы к API временно приостановлены."""
\ No newline at end of file
@@ -1,5 +1,7 @@
 import logging
 import os
+import random
+import sys
 import time
 from http import HTTPStatus
 
@@ -7,7 +9,8 @@ import requests
 import telegram
 from dotenv import load_dotenv
 
-from exception import InvalidJSONTransform, SendMessedge
+from exception import (ApiAuthError, CircuitOpenError, InvalidJSONTransform,
+                       SendMessedge)
 
 load_dotenv()
 
@@ -16,8 +19,21 @@ TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
 RETRY_PERIOD = 600
+CURSOR_PATH = os.getenv('CURSOR_PATH', '.cursor')
+BACKOFF_BASE = 30
+BACKOFF_CAP = 3600
+CONNECT_TIMEOUT = 5
+POLL_TIMEOUT = 25
+POLL_RETRIES = 3
+CIRCUIT_FAILS = 5
+CIRCUIT_COOLDOWN = 300
+RESEND_PERIOD = 3600
+TELEGRAM_TIMEOUT = 10
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
-HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+HEADERS = {
+    'Authorization': f'OAuth {PRACTICUM_TOKEN}',
+    'Accept-Encoding': 'gzip, deflate',
+}
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -25,6 +41,10 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+_API_CACHE = {'from_date': None, 'etag': None, 'payload': None}
+
+_CIRCUIT = {'state': 'closed', 'fails': 0, 'opened_at': 0}
+
 
 def check_tokens():
     """проверяет доступность переменных окружения.
@@ -41,41 +61,114 @@ def send_message(bot, message):
     строку с текстом сообщения.
     """
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-        logging.debug(f'Бот отправил сообщение "{message}"')
+        bot.send_message(
+            chat_id=TELEGRAM_CHAT_ID,
+            text=message,
+            timeout=TELEGRAM_TIMEOUT,
+        )
+        logging.debug('Бот отправил сообщение "%s"', message)
     except telegram.error.TelegramError as error:
-        logging.error(f'Бот не отправил сообщение"{message}": {error}')
+        logging.error('Бот не отправил сообщение "%s": %s', message, error)
         raise SendMessedge(
-            f'Бот не отправил сообщение"{message}": {error}'
+            f'Бот не отправил сообщение "{message}": {error}'
         )
 
 
+def _circuit_blocked():
+    """Проверяет, открыт ли предохранитель запросов к API."""
+    if _CIRCUIT['state'] == 'open':
+        if time.time() - _CIRCUIT['opened_at'] < CIRCUIT_COOLDOWN:
+            return True
+        _CIRCUIT['state'] = 'half_open'
+    return False
+
+
+def _circuit_record(success):
+    """Обновляет состояние предохранителя по результату запроса."""
+    if success:
+        _CIRCUIT.update(state='closed', fails=0)
+        return
+    _CIRCUIT['fails'] += 1
+    if _CIRCUIT['fails'] >= CIRCUIT_FAILS:
+        _CIRCUIT.update(state='open', opened_at=time.time())
+
+
+def _request_api(headers, params):
+    """делает HTTP-запрос к API с повтором при таймауте чтения."""
+    for _ in range(POLL_RETRIES):
+        try:
+            return requests.get(
+                ENDPOINT,
+                headers=headers,
+                params=params,
+                timeout=(CONNECT_TIMEOUT, POLL_TIMEOUT),
+            )
+        except requests.exceptions.ReadTimeout:
+            logging.debug('Таймаут чтения ответа API, повторный запрос')
+        except requests.exceptions.Timeout as error:
+            message = f'Таймаут при запросе к API: {error}'
+            logging.error(message)
+            raise TimeoutError(message)
+        except requests.exceptions.RequestException as error:
+            message = f'Ошибка при запросе к API: {error}'
+            logging.error(message)
+            raise ConnectionError(message)
+    message = 'API не ответил за отведённое время'
+    logging.error(message)
+    raise ConnectionError(message)
+
+
 def get_api_answer(timestamp):
     """делает запрос к единственному эндпоинту API-сервиса.
     В качестве параметра в функцию передается временная метка.
     В случае успешного запроса должна вернуть ответ API,
     приведя его из формата JSON к типам данных Python.
     """
-    params = {'from_date': timestamp}
-    try:
-        response = requests.get(
-            ENDPOINT,
-            headers=HEADERS,
-            params=params,
+    if _circuit_blocked():
+        raise CircuitOpenError(
+            'Запросы к API приостановлены после серии сбоев'
         )
-    except requests.exceptions.RequestException:
-        message = f'Ошибка при запросе к API: {response.status_code}'
-        logging.error(message)
-        raise requests.exceptions.RequestException(message)
+    try:
+        payload = _fetch_api_answer(timestamp)
+    except ApiAuthError:
+        raise
+    except Exception:
+        _circuit_record(False)
+        raise
+    _circuit_record(True)
+    return payload
+
+
+def _fetch_api_answer(timestamp):
+    """запрашивает ответ API без учёта состояния предохранителя."""
+    params = {'from_date': timestamp}
+    headers = HEADERS
+    if _API_CACHE['etag'] and _API_CACHE['from_date'] == timestamp:
+        headers = {**HEADERS, 'If-None-Match': _API_CACHE['etag']}
+    response = _request_api(headers, params)
+    if (response.status_code == HTTPStatus.NOT_MODIFIED
+            and _API_CACHE['payload'] is not None):
+        logging.debug('Ответ API не изменился, используется кеш')
+        return _API_CACHE['payload']
+    if response.status_code in (
+            HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+    ):
+        raise ApiAuthError('Ошибка авторизации при запросе к API')
     if response.status_code != HTTPStatus.OK:
         raise ReferenceError('Статус ответа API не OK')
     logging.info('Ответ на запрос к API: 200 OK')
     try:
-        return response.json()
-    except Exception as error:
+        payload = response.json()
+    except ValueError as error:
         message = f'Сбой при переводе в формат json: {error}'
         logging.error(message)
         raise InvalidJSONTransform(message)
+    _API_CACHE.update(
+        from_date=timestamp,
+        etag=getattr(response, 'headers', {}).get('ETag'),
+        payload=payload,
+    )
+    return payload
 
 
 def check_response(response):
@@ -100,45 +193,103 @@ def parse_status(homework):
     Telegram строку, содержащую один из вердиктов
     словаря HOMEWORK_VERDICTS.
     """
-    if 'homework_name' not in homework:
-        raise KeyError('Ключ homevork_name отсустсвует в homework')
-    homework_name = homework.get('homework_name')
-    if 'status' not in homework:
-        raise KeyError('Ключ status отсутствует в homework')
-    homework_status = homework['status']
-    if homework_status not in HOMEWORK_VERDICTS:
+    try:
+        homework_name = homework['homework_name']
+        homework_status = homework['status']
+    except KeyError as error:
+        raise KeyError(f'Отсутствует ключ {error} в homework') from error
+    verdict = HOMEWORK_VERDICTS.get(homework_status)
+    if verdict is None:
         raise KeyError(f'Статус {homework_status} неизвестен')
-    verdict = HOMEWORK_VERDICTS[homework_status]
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+def _backoff(attempt):
+    """Выдерживает паузу с экспоненциальным ростом и джиттером."""
+    time.sleep(random.uniform(
+        0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    ))
+    return attempt + 1
+
+
+def _load_timestamp():
+    """читает сохранённую временную метку или берёт текущее время."""
+    try:
+        with open(CURSOR_PATH) as cursor_file:
+            return int(cursor_file.read())
+    except (OSError, ValueError):
+        return int(time.time())
+
+
+def _save_timestamp(timestamp):
+    """сохраняет временную метку для следующего запуска."""
+    try:
+        with open(CURSOR_PATH, 'w') as cursor_file:
+            cursor_file.write(str(timestamp))
+    except OSError as error:
+        logging.error('Не удалось сохранить метку времени: %s', error)
+
+
+def _handle_updates(response, send, timestamp):
+    """Обрабатывает ответ API и возвращает новую временную метку."""
+    homework = check_response(response)
+    logging.info('Список домашних работ получен')
+    if not homework:
+        logging.info('Новых заданий нет')
+        send('На данный момент обновлений нет')
+        return timestamp
+    send(parse_status(homework[0]))
+    return response['current_date']
+
+
 def main():
     """Основная логика работы бота."""
     if not check_tokens():
+        tokens = {
+            'PRACTICUM_TOKEN': PRACTICUM_TOKEN,
+            'TELEGRAM_TOKEN': TELEGRAM_TOKEN,
+            'TELEGRAM_CHAT_ID': TELEGRAM_CHAT_ID,
+        }
+        missing = [name for name, value in tokens.items() if not value]
         logging.critical(
-            'Отсутствует обязательная переменная окружения.'
-            'Программа принудительно остановлена.'
+            'Отсутствуют обязательные переменные окружения: %s. '
+            'Программа принудительно остановлена.',
+            ', '.join(missing),
         )
         raise SystemExit
 
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
+    timestamp = _load_timestamp()
+    attempt = 0
+    last_message = None
+    last_sent_at = 0.0
+
+    def send_unique(message):
+        """Отправляет сообщение, если оно не повторяет предыдущее."""
+        nonlocal last_message, last_sent_at
+        if (message != last_message
+                or time.time() - last_sent_at > RESEND_PERIOD):
+            send_message(bot, message)
+            last_message, last_sent_at = message, time.time()
+
     while True:
         try:
             logging.debug('Начало итерации, запрос к API')
             response = get_api_answer(timestamp)
-            homework = check_response(response)
-            logging.info('Список домашних работ получен')
-            if not homework:
-                logging.info('Новых заданий нет')
-                send_message(bot, 'На данный момент обновлений нет')
-            else:
-                send_message(bot, parse_status(homework[0]))
-                timestamp = response['current_date']
+            attempt = 0
+            timestamp = _handle_updates(response, send_unique, timestamp)
+        except ApiAuthError as error:
+            logging.critical(error)
+            raise SystemExit
+        except CircuitOpenError as error:
+            logging.warning(error)
+            attempt = _backoff(attempt)
         except Exception as error:
             logging.error(error)
-            send_message(bot, parse_status(check_response(response)))
-        finally:
+            send_unique(f'Сбой в работе программы: {error}')
+            attempt = _backoff(attempt)
+        else:
+            _save_timestamp(timestamp)
             time.sleep(RETRY_PERIOD)
 
 
@@ -146,6 +297,9 @@ if __name__ == '__main__':
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s, %(levelname)s, %(message)s',
-        filename='program.log'
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler('program.log'),
+        ],
     )
     main()